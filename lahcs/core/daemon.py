@@ -0,0 +1,184 @@
+'''
+Transform daemon, keep a pool of warm worker processes with models cached.
+
+Requests are accepted over a unix socket, one json object per line:
+---
+{"src_path": ..., "tar_path": ..., "err_path": ...,
+ "read_model": "pkg.models.MyReadModel", "write_model": "pkg.models.MyWriteModel",
+ "xfr": "pkg.xfr.MyXfr"}
+
+and answered by one json line:
+---
+{"err_cnt": 0, "stats": {...}}  or  {"error": "..."}
+'''
+import os
+import json
+import stat
+import time
+import socket
+import logging
+import argparse
+import threading
+import socketserver
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from lahcs import utils
+from lahcs.settings import DAEMON_SOCKET
+from lahcs.core.op import transform
+from lahcs.core.exceptions import ExcutingError
+
+
+# model instances of the worker process, by import path
+_models = {}
+
+
+def _model(path):
+    if path not in _models:
+        _models[path] = utils.import_object(path)()
+    return _models[path]
+
+
+def _warm(preload):
+    for path in preload:
+        utils.import_object(path)
+
+
+def _memo_delta(before, after):
+    '''memo stats of a request, from the cumulative stats of the worker'''
+    delta = {}
+    for name, stats in after.items():
+        hits = stats['hits'] - before[name]['hits']
+        misses = stats['misses'] - before[name]['misses']
+        delta[name] = dict(stats, hits=hits, misses=misses,
+                           hit_rate=hits / (hits + misses) if hits + misses else 0.0)
+    return delta
+
+
+def _transform(req):
+    '''run in worker process. return: err_cnt, stats'''
+    start = time.time()
+    read_model = _model(req['read_model'])
+    write_model = _model(req['write_model'])
+    xfr = utils.import_object(req.get('xfr', 'lahcs.xfr.DefaultXfr'))()
+    memo_before = write_model.memo_stats()
+
+    err_cnt = transform(read_model, write_model, xfr, req['src_path'], req['tar_path'], req['err_path'],
+                        profile=req.get('profile'), profile_fraction=req.get('profile_fraction', 1.0))
+
+    stats = {
+        'pid': os.getpid(),
+        'duration': time.time() - start,
+        'memo': _memo_delta(memo_before, write_model.memo_stats()),
+    }
+    return err_cnt, stats
+
+
+def _remove_stale_socket(socket_path):
+    '''remove the socket left by a dead daemon, refuse to take over a live one'''
+    try:
+        mode = os.stat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+
+    if not stat.S_ISSOCK(mode):
+        raise ExcutingError('%s exists and is not a socket' % socket_path)
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except ConnectionRefusedError:
+            pass
+        else:
+            raise ExcutingError('another daemon is listening on %s' % socket_path)
+
+    os.remove(socket_path)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        logger = logging.getLogger('lahcs.core.daemon')
+
+        for line in self.rfile:
+            try:
+                req = json.loads(line.decode('utf-8'))
+                logger.info('transform request: %s' % req['src_path'])
+                err_cnt, stats = self.server.submit(_transform, req)
+                resp = {'err_cnt': err_cnt, 'stats': stats}
+            except Exception as e:
+                logger.exception('transform request failed')
+                resp = {'error': repr(e)}
+
+            self.wfile.write(json.dumps(resp).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+class TransformDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    '''unix socket server dispatching transform requests to warm worker processes'''
+    daemon_threads = True
+
+    def __init__(self, socket_path=DAEMON_SOCKET, processes=4, preload=()):
+        '''
+            processes: number of worker processes
+            preload: import paths of models and xfrs to import in each worker at start
+        '''
+        _remove_stale_socket(socket_path)
+
+        self.processes = processes
+        self.preload = tuple(preload)
+        self._executor_lock = threading.Lock()
+        self.executor = self._new_executor()
+        super().__init__(socket_path, _RequestHandler)
+
+    def _new_executor(self):
+        return ProcessPoolExecutor(max_workers=self.processes, initializer=_warm, initargs=(self.preload, ))
+
+    def submit(self, fn, *args):
+        '''run fn in a worker and return its result, the pool is rebuilt if a worker died'''
+        executor = self.executor
+        try:
+            return executor.submit(fn, *args).result()
+        except BrokenProcessPool:
+            with self._executor_lock:
+                # other handler threads may have rebuilt it already
+                if self.executor is executor:
+                    logging.getLogger('lahcs.core.daemon').warning('worker pool broken, rebuilding')
+                    executor.shutdown(wait=False)
+                    self.executor = self._new_executor()
+            raise
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+def request(src_path, tar_path, err_path, read_model, write_model, xfr='lahcs.xfr.DefaultXfr',
+            socket_path=DAEMON_SOCKET, **kwargs):
+    '''send a transform request to the daemon. return: response dict'''
+    req = dict(kwargs, src_path=src_path, tar_path=tar_path, err_path=err_path,
+               read_model=read_model, write_model=write_model, xfr=xfr)
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        with sock.makefile('rwb') as f:
+            f.write(json.dumps(req).encode('utf-8') + b'\n')
+            f.flush()
+            return json.loads(f.readline().decode('utf-8'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='lahcs transform daemon')
+    parser.add_argument('--socket', default=DAEMON_SOCKET)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--preload', nargs='*', default=[])
+    args = parser.parse_args()
+
+    utils.set_logger('lahcs')
+    with TransformDaemon(args.socket, args.processes, args.preload) as server:
+        server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
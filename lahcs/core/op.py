@@ -5,11 +5,20 @@ from collections import OrderedDict
 from lahcs import utils
 from lahcs.models.fields import (FieldError, )
 from lahcs.core.exceptions import XfrError
+from lahcs.core.profile import TransformProfiler
 
 
-def transform(read_model, write_model, xfr, src_path, tar_path, err_path):
-    '''return err_cnt'''
+def transform(read_model, write_model, xfr, src_path, tar_path, err_path,
+              profile=None, profile_fraction=1.0):
+    '''
+    return err_cnt
+    profile: None, 'sample' or 'cprofile', profile the fraction profile_fraction of lines,
+             the report is written to err_path + '.prof'
+             'sample' times each field / xfr call on the sampled lines only,
+             'cprofile' also runs cProfile over them, see TransformProfiler
+    '''
     logger = logging.getLogger('lahcs.core.op.transform')
+    profiler = TransformProfiler(read_model, write_model, xfr, profile, profile_fraction) if profile else None
 
     err_record = OrderedDict()
     def err_put(err_key, err_desc, linum):
@@ -24,55 +33,65 @@ def transform(read_model, write_model, xfr, src_path, tar_path, err_path):
         'error  file: %s' % (src_path, tar_path, err_path))
 
     with open(src_path, 'r') as src_file, \
-         open(tar_path, 'w') as tar_file, \
+         write_model._open(tar_path) as tar_file, \
          open(err_path, 'w') as err_file :
 
         out = Queue()
-        for linum, line in enumerate(src_file):
-
-            try:
-                d = read_model._parse(line.rstrip('\r\n'))
-            except FieldError as e:
-                fieldname, restline, reason = e.args
-                err_key = '%s | %s' % (fieldname, reason)
-                err_desc = 'field: %s | %s : %s' % (repr(fieldname), reason, repr(restline))
-                err_put(err_key, err_desc, linum +1)
-
-                err_file.write(line)
-                # out = Queue()
-                continue
-
-            try:
-                xfr.transform(d, out)
-            except XfrError as e:
-                err_put(repr(e), repr(e), linum +1)
-
-                err_file.write(line)
-                out = Queue()
-                continue
-
-            outlines = []
-            try:
-                while not out.empty():
-                    w = out.get()
-                    outlines.append(write_model._parse(w))
-            except FieldError as e:
-                fieldname, restline, reason = e.args
-                err_key = '%s | %s' % (fieldname, reason)
-                err_desc = 'field: %s | %s : %s' % (repr(fieldname), reason, repr(restline))
-                err_put(err_key, err_desc, linum +1)
-
-                err_file.write(line)
-                out = Queue()
-                continue
-
-            tar_file.writelines(outlines)
+        try:
+            for linum, line in enumerate(src_file):
+                if profiler:
+                    profiler.switch()
+
+                try:
+                    d = read_model._parse(line.rstrip('\r\n'))
+                except FieldError as e:
+                    fieldname, restline, reason = e.args
+                    err_key = '%s | %s' % (fieldname, reason)
+                    err_desc = 'field: %s | %s : %s' % (repr(fieldname), reason, repr(restline))
+                    err_put(err_key, err_desc, linum +1)
+
+                    err_file.write(line)
+                    # out = Queue()
+                    continue
+
+                try:
+                    xfr.transform(d, out)
+                except XfrError as e:
+                    err_put(repr(e), repr(e), linum +1)
+
+                    err_file.write(line)
+                    out = Queue()
+                    continue
+
+                outlines = []
+                try:
+                    while not out.empty():
+                        w = out.get()
+                        outlines.append(write_model._parse(w))
+                except FieldError as e:
+                    fieldname, restline, reason = e.args
+                    err_key = '%s | %s' % (fieldname, reason)
+                    err_desc = 'field: %s | %s : %s' % (repr(fieldname), reason, repr(restline))
+                    err_put(err_key, err_desc, linum +1)
+
+                    err_file.write(line)
+                    out = Queue()
+                    continue
+
+                tar_file.writelines(outlines)
+        finally:
+            if profiler:
+                profiler.stop()
 
     err_cnt = sum(cnt for err_key, (cnt, err_desc, linum) in err_record.items())
     err_explains = '\n'.join('count: %-4d linum: %-4d  %s' % (cnt, linum, err_desc) 
                                 for err_key, (cnt, err_desc, linum) in err_record.items())
 
     logger.info('transform end. \nerror count %d \n%s' % (err_cnt, err_explains))
+
+    if profiler:
+        profiler.write_report(err_path + '.prof')
+        logger.info('profile report: %s' % (err_path + '.prof'))
     return err_cnt
 
 
@@ -0,0 +1,136 @@
+import io
+import time
+import pstats
+import cProfile
+
+from lahcs.models.fields import RegexField
+
+
+class _Timer(object):
+    '''wrap a callable, accumulate its calls and time'''
+
+    def __init__(self, label, func):
+        self.label = label
+        self.func = func
+        self.calls = 0
+        self.seconds = 0.0
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.func(*args, **kwargs)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.calls += 1
+
+
+class TransformProfiler(object):
+    '''
+    Profiler of transform over an evenly spaced fraction of lines.
+    On those lines, every call of the read fields, xfr methods and write fields is
+    timed through wrappers; the other lines run unwrapped. This is line sampling,
+    not a statistical stack-sampling profiler.
+    mode 'sample': only the wrapper timings
+    mode 'cprofile': additionally runs cProfile over the same lines
+    '''
+    MODES = ('sample', 'cprofile')
+    REPORT_TOP = 30
+
+    def __init__(self, read_model, write_model, xfr, mode='sample', fraction=1.0):
+        if mode not in self.MODES:
+            raise ValueError('profile mode should be one of %s' % (self.MODES, ))
+
+        self.mode = mode
+        self.fraction = fraction
+        self.cprofile = cProfile.Profile() if mode == 'cprofile' else None
+
+        self.lines = 0
+        self.sampled_lines = 0
+        self.line_seconds = 0.0
+        self._acc = 0.0
+        self._line_start = None
+
+        # (obj, attr, timer, whether attr is set on the instance)
+        self.timers = []
+        for name, field in read_model._named_fields:
+            if isinstance(field, RegexField):
+                self._add_timer(field, 'extract', 'read  %s %s' % (name, field))
+
+        for attr in dir(xfr):
+            if not attr.startswith('_') and callable(getattr(xfr, attr)):
+                self._add_timer(xfr, attr, 'xfr   %s.%s' % (xfr.__class__.__name__, attr))
+
+        for name, field in write_model._named_fields:
+            desc = field.__class__.__name__
+            if getattr(field, 'regex_str', None):
+                desc += '(regex=%r)' % field.regex_str
+            self._add_timer(field, 'dump', 'write %s %s' % (name, desc))
+
+    def _add_timer(self, obj, attr, label):
+        self.timers.append((obj, attr, _Timer(label, getattr(obj, attr)), attr in vars(obj)))
+
+    def _install(self):
+        for obj, attr, timer, own in self.timers:
+            setattr(obj, attr, timer)
+
+    def _uninstall(self):
+        for obj, attr, timer, own in self.timers:
+            if vars(obj).get(attr) is not timer:
+                continue
+            if own:
+                setattr(obj, attr, timer.func)
+            else:
+                delattr(obj, attr)
+
+    def switch(self):
+        '''called before each line, end the profiling of last line and decide for this one'''
+        self.stop()
+        self.lines += 1
+
+        self._acc += self.fraction
+        if self._acc < 1:
+            return
+        self._acc -= 1
+
+        self.sampled_lines += 1
+        self._install()
+        if self.cprofile:
+            self.cprofile.enable()
+        self._line_start = time.perf_counter()
+
+    def stop(self):
+        '''end the profiling of current line, safe to be called more than once'''
+        if self._line_start is None:
+            return
+
+        self.line_seconds += time.perf_counter() - self._line_start
+        self._line_start = None
+        try:
+            if self.cprofile:
+                self.cprofile.disable()
+        finally:
+            self._uninstall()
+
+    def report(self):
+        timers = sorted((timer for obj, attr, timer, own in self.timers), key=lambda t: t.seconds, reverse=True)
+        lines = [
+            'mode: %s  fraction: %s  lines: %d  sampled: %d  sampled seconds: %.6f'
+                % (self.mode, self.fraction, self.lines, self.sampled_lines, self.line_seconds),
+            '',
+            '%-4s %12s %10s %12s %7s  %s' % ('rank', 'seconds', 'calls', 'us/call', 'share', 'item'),
+        ]
+        for rank, t in enumerate((t for t in timers if t.calls), 1):
+            lines.append('%-4d %12.6f %10d %12.3f %6.1f%%  %s' % (
+                rank, t.seconds, t.calls, t.seconds / t.calls * 1e6,
+                100.0 * t.seconds / self.line_seconds if self.line_seconds else 0.0, t.label))
+
+        if self.cprofile:
+            stream = io.StringIO()
+            pstats.Stats(self.cprofile, stream=stream).sort_stats('cumulative').print_stats(self.REPORT_TOP)
+            lines.extend(['', stream.getvalue()])
+
+        return '\n'.join(lines) + '\n'
+
+    def write_report(self, path):
+        with open(path, 'w') as f:
+            f.write(self.report())
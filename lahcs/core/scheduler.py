@@ -0,0 +1,147 @@
+import os
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+from lahcs import utils
+from lahcs.settings import DW_TMP
+from lahcs.core.op import transform
+from lahcs.core.terminals import FileTerminal
+
+
+class Job(object):
+    '''extract + transform job of a (sa_id, tbl_id)'''
+
+    def __init__(self, sa_id, tbl_id, src_lists, seq_num, read_model, write_model,
+                 xfr='lahcs.xfr.DefaultXfr', weight=1):
+        '''
+            src_lists: lines of sources.lis
+            read_model, write_model, xfr: classes or their dotted import paths
+            weight: memory / cpu weight of the job, against the capacity of scheduler
+        '''
+        self.sa_id = sa_id
+        self.tbl_id = tbl_id
+        self.src_lists = src_lists
+        self.seq_num = seq_num
+        self.read_model = read_model
+        self.write_model = write_model
+        self.xfr = xfr
+        self.weight = weight
+
+    def __str__(self):
+        return '%s.%s' % (self.sa_id, self.tbl_id)
+
+    def source_size(self):
+        return sum(os.path.getsize(f) for f in FileTerminal(self.sa_id, self.tbl_id).resolve(self.src_lists))
+
+    def run(self):
+        '''return: err_cnt'''
+        read_model = utils.import_object(self.read_model)()
+        write_model = utils.import_object(self.write_model)()
+        xfr = utils.import_object(self.xfr)()
+
+        err_cnt = 0
+        for src_path in FileTerminal(self.sa_id, self.tbl_id).extract(self.src_lists, self.seq_num):
+            tar_path = os.path.join(DW_TMP, self.sa_id, os.path.basename(src_path))
+            err_path = tar_path + '.err'
+            err_cnt += transform(read_model, write_model, xfr, src_path, tar_path, err_path)
+        return err_cnt
+
+
+def _run_job(job):
+    '''return: err_cnt, duration, error'''
+    start = time.time()
+    try:
+        err_cnt, error = job.run(), None
+    except Exception as e:
+        err_cnt, error = None, repr(e)
+    return err_cnt, time.time() - start, error
+
+
+class Scheduler(object):
+    '''
+    Run jobs in worker processes, largest sources first (longest-processing-time).
+    A job is started only if the weights of running jobs stay within capacity.
+    A job heavier than capacity runs alone, once the running jobs are done.
+    '''
+
+    def __init__(self, processes=4, capacity=None):
+        self.processes = processes
+        self.capacity = capacity if capacity is not None else processes
+
+    def run(self, jobs):
+        '''return: list of summary dicts, in the order of jobs'''
+        logger = logging.getLogger('lahcs.core.scheduler')
+
+        summaries = []
+        pending = []
+        for i, job in enumerate(jobs):
+            summary = {'job': str(job), 'size': None, 'err_cnt': None, 'duration': None, 'error': None}
+            summaries.append(summary)
+            try:
+                summary['size'] = job.source_size()
+            except Exception as e:
+                summary['error'] = repr(e)
+                continue
+            pending.append((i, job))
+
+        pending.sort(key=lambda x: summaries[x[0]]['size'], reverse=True)
+
+        running = {}
+        load = 0
+        executor = ProcessPoolExecutor(max_workers=self.processes)
+        try:
+            while pending or running:
+                while pending and len(running) < self.processes:
+                    if pending[0][1].weight > self.capacity:
+                        # the largest pending job runs alone, drain the running ones first
+                        k = None
+                    else:
+                        k = next((k for k, (i, job) in enumerate(pending) if load + job.weight <= self.capacity), None)
+                    if k is None:
+                        if running:
+                            break
+                        k = 0
+
+                    i, job = pending.pop(k)
+                    logger.info('job %s starting, source size %d' % (job, summaries[i]['size']))
+                    running[executor.submit(_run_job, job)] = (i, job)
+                    load += job.weight
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                broken = False
+                for future in done:
+                    i, job = running.pop(future)
+                    load -= job.weight
+                    summary = summaries[i]
+                    try:
+                        summary['err_cnt'], summary['duration'], summary['error'] = future.result()
+                    except BrokenProcessPool as e:
+                        broken = True
+                        summary['error'] = repr(e)
+                    except Exception as e:
+                        summary['error'] = repr(e)
+                    logger.info('job %s end. duration %s err_cnt %s %s'
+                                % (job, '%.1fs' % summary['duration'] if summary['duration'] is not None else '-',
+                                   summary['err_cnt'], summary['error'] or ''))
+
+                if broken:
+                    # a worker died (e.g. killed by oom), the jobs still running are lost with the pool
+                    for future, (i, job) in running.items():
+                        summaries[i]['error'] = 'worker pool broken while job running'
+                        logger.info('job %s end. %s' % (job, summaries[i]['error']))
+                    running = {}
+                    load = 0
+
+                    executor.shutdown(wait=False)
+                    executor = ProcessPoolExecutor(max_workers=self.processes)
+        finally:
+            executor.shutdown()
+
+        logger.info('scheduler end.\n%s' % '\n'.join(
+            '%-40s size: %-12s duration: %-8s err_cnt: %-6s %s'
+            % (s['job'], s['size'], '%.1f' % s['duration'] if s['duration'] is not None else '-',
+               s['err_cnt'], s['error'] or '')
+            for s in summaries))
+        return summaries
@@ -1,8 +1,9 @@
+import os
 import re
 import shutil
-from glob import glob
+import logging
 
-from settings import (DW_ENV, DW_EXTRACT, )
+from lahcs.settings import (DW_ENV, DW_EXTRACT, )
 from lahcs.core.exceptions import JobConfigError, ExcutingError, SHEvaluationError
 from lahcs import utils
 
@@ -39,16 +40,16 @@ class HiveTerminal(DatabaseTerminal):
 
 
 class FileTerminal(SourceTerminal):
-    def extract(self, src_lists, seq_num):
+    def resolve(self, src_lists):
         '''
+        return: the source files matched by src_lists, without moving them
         src_list is a line like this:
         ---
         1 ${DW_LAND}/sa_id/files*.dat
         '''
-        logger = logging.getLogger('lahcs.core.terminal.file')
-
         src_files = []
-        tar_files = []
+        seen = set()
+        globs = utils.GlobCache()
 
         for src_list in src_lists:
             src_params = self._split_src_list(src_list)
@@ -58,18 +59,31 @@ class FileTerminal(SourceTerminal):
             try:
                 filepath = utils.sh_envaluate(src_params[1], DW_ENV)
             except SHEvaluationError as e:
-                raise ExcutingError('sources.lis error: %s' % str(e)
+                raise ExcutingError('sources.lis error: %s' % str(e))
 
-            fileglobs = glob(filepath)
+            fileglobs = globs.glob(filepath)
             if not fileglobs:
                 raise ExcutingError('sources.lis error: %s , item not match with any files' % src_list)
 
             for fg in fileglobs:
                 if not os.path.isfile(fg):
                     raise ExcutingError('sources.lis error: %s is not valid file' % fg)
-                if fg not in files:
+                if fg not in seen:
+                    seen.add(fg)
                     src_files.append(fg)
 
+        return src_files
+
+    def extract(self, src_lists, seq_num):
+        '''
+        move the source files into extract directory
+        return: the extracted files
+        '''
+        logger = logging.getLogger('lahcs.core.terminal.file')
+
+        src_files = self.resolve(src_lists)
+        tar_files = []
+
         try:
             for i, src_file in enumerate(src_files):
                 tar_file = os.path.join(DW_EXTRACT, self.sa_id, '%s.%d.dat.%d' % (self.tbl_id, i, seq_num))
@@ -87,6 +101,9 @@ class FileTerminal(SourceTerminal):
 
                 shutil.move(tar_file, src_file)
                 logger.info('rollback file: %s %s' % (tar_file, src_file))
+            raise
+
+        return tar_files
 
 
 
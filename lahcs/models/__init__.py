@@ -82,6 +82,14 @@ class WriteModel(BaseModel):
     def _parse(self, d):
         raise NotImplementedError()
 
+    def _open(self, path):
+        '''return: file like object to write the results of _parse'''
+        return open(path, 'w')
+
+    def memo_stats(self):
+        '''return: dump cache statistics of memoized fields'''
+        return { name: field.memo_stats() for name, field in self._named_fields if field.memo }
+
 
 class TextWriteModel(WriteModel):
     '''Text Write Model'''
@@ -0,0 +1,338 @@
+'''
+Compact binary columnar output for write models.
+
+File layout (all integers little-endian):
+---
+MAGIC
+row group 0: column chunk 0, column chunk 1, ...
+row group 1: ...
+footer (json)
+footer length (8 bytes)
+MAGIC
+
+Each column chunk is made of a null bitmap (bit set when value present),
+the packed values, and for string (and wide decimal) columns the row
+group dictionary (offsets + utf-8 blob). The footer keeps the schema, and for every chunk
+its position, null count and min/max stats.
+'''
+import os
+import sys
+import json
+import mmap
+import struct
+import decimal
+import datetime
+from array import array
+
+from . import WriteModel, FieldError
+from .fields import (String, BaseIntegerWriteField, BigInt, Float, BaseFloatWriteField,
+                     Decimal, Date, Timestamp, )
+
+
+MAGIC = b'LAHCS\x01'
+FOOTER_LENGTH = struct.Struct('<Q')
+
+EPOCH_DATE = datetime.date(1970, 1, 1)
+EPOCH_TIMESTAMP = datetime.datetime(1970, 1, 1)
+
+INDEX_TYPECODE = 'I'
+# kinds stored as dictionary encoded strings
+DICTIONARY_KINDS = ('string', 'wide_decimal')
+TYPECODE_RANGE = {
+    'i': (-2**31, 2**31-1),
+    'q': (-2**63, 2**63-1),
+    'Q': (0, 2**64-1),
+}
+
+# decimals with more digits than this can not be scaled into a int64,
+# they are stored as dictionary encoded strings of kind wide_decimal
+MAX_DECIMAL_DIGITS = 18
+
+
+def _little_endian(arr):
+    if sys.byteorder == 'big':
+        arr.byteswap()
+    return arr
+
+
+def _column_spec(field):
+    '''return: kind, typecode, scale of the column for a write field'''
+    if isinstance(field, String):
+        return 'string', INDEX_TYPECODE, 0
+    if isinstance(field, BaseIntegerWriteField):
+        return 'int', 'Q' if isinstance(field, BigInt) and field.unsigned else 'q', 0
+    if isinstance(field, BaseFloatWriteField):
+        return 'float', 'f' if isinstance(field, Float) else 'd', 0
+    if isinstance(field, Decimal):
+        if field.m > MAX_DECIMAL_DIGITS:
+            return 'wide_decimal', INDEX_TYPECODE, field.d
+        return 'decimal', 'q', field.d
+    if isinstance(field, Date):
+        return 'date', 'i', 0
+    if isinstance(field, Timestamp):
+        return 'timestamp', 'q', 0
+    raise TypeError('field type %s is not supported by columnar output' % field.__class__.__name__)
+
+
+def _encode(kind, scale, s):
+    '''encode the dumped string of a field to its native column value'''
+    if s == '':
+        return None
+    if kind in DICTIONARY_KINDS:
+        return s
+    if kind == 'int':
+        return int(s)
+    if kind == 'float':
+        return float(s)
+    if kind == 'decimal':
+        number = decimal.Decimal(s).scaleb(scale)
+        if number != number.to_integral_value():
+            raise ValueError('decimal has more fractional digits than scale %d' % scale)
+        return int(number)
+    # dump formats are '%Y-%m-%d' and '%Y-%m-%d %H:%M:%S', but strftime does not
+    # zero-pad years below 1000, so neither fromisoformat nor strptime accept them
+    if kind == 'date':
+        return (datetime.date(*map(int, s.split('-'))) - EPOCH_DATE).days
+    if kind == 'timestamp':
+        date, time = s.split(' ')
+        ts = datetime.datetime(*map(int, date.split('-') + time.split(':')))
+        delta = ts - EPOCH_TIMESTAMP
+        return delta.days * 86400 + delta.seconds
+
+
+def _decode(kind, scale, v):
+    '''decode the native column value to python object'''
+    if v is None:
+        return None
+    if kind == 'decimal':
+        return decimal.Decimal(v).scaleb(-scale)
+    if kind == 'wide_decimal':
+        return decimal.Decimal(v)
+    if kind == 'date':
+        return EPOCH_DATE + datetime.timedelta(days=v)
+    if kind == 'timestamp':
+        return EPOCH_TIMESTAMP + datetime.timedelta(seconds=v)
+    return v
+
+
+class ColumnarWriteModel(WriteModel):
+    '''Columnar Write Model
+
+       Rows are buffered into row groups of ROW_GROUP_SIZE, and each column
+       is written natively: packed integers / doubles, dictionary encoded
+       strings, dates as day numbers and timestamps as epoch seconds.
+    '''
+    ROW_GROUP_SIZE = 65536
+
+    def __init__(self):
+        super().__init__()
+        self._columns = [ (name, ) + _column_spec(field) for name, field in self._named_fields ]
+
+    def _parse(self, d):
+        row = []
+        for s, (name, kind, typecode, scale) in zip(self._form_contents(d), self._columns):
+            try:
+                v = _encode(kind, scale, s)
+            except (ValueError, ArithmeticError) as e:
+                raise FieldError(name, s, 'content can not be encoded to columnar %s column: %s' % (kind, e))
+            if v is not None and typecode in TYPECODE_RANGE:
+                low, high = TYPECODE_RANGE[typecode]
+                if not low <= v <= high:
+                    raise FieldError(name, s, 'number exceed range of columnar %s column' % kind)
+            row.append(v)
+        return tuple(row)
+
+    def _open(self, path):
+        return ColumnarWriter(self, path)
+
+
+class ColumnarWriter(object):
+    '''file like object accept rows from ColumnarWriteModel._parse'''
+
+    def __init__(self, model, path):
+        self.columns = model._columns
+        self.row_group_size = model.ROW_GROUP_SIZE
+
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC)
+        self._rows = []
+        self._row_groups = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def writelines(self, rows):
+        for row in rows:
+            self._rows.append(row)
+            if len(self._rows) >= self.row_group_size:
+                self._flush()
+
+    def _flush(self):
+        num_rows = len(self._rows)
+        if not num_rows:
+            return
+
+        chunks = []
+        for i, (name, kind, typecode, scale) in enumerate(self.columns):
+            values = [ row[i] for row in self._rows ]
+            stat_key = decimal.Decimal if kind == 'wide_decimal' else None
+            present = [ v for v in values if v is not None ]
+
+            bitmap = bytearray((num_rows + 7) // 8)
+            for j, v in enumerate(values):
+                if v is not None:
+                    bitmap[j >> 3] |= 1 << (j & 7)
+
+            dict_offsets = dict_blob = b''
+            if kind in DICTIONARY_KINDS:
+                dictionary = {}
+                for v in present:
+                    dictionary.setdefault(v, len(dictionary))
+                data = array(typecode, (dictionary[v] if v is not None else 0 for v in values))
+
+                encoded = [ v.encode('utf-8') for v in dictionary ]
+                offsets = array(INDEX_TYPECODE, [0])
+                for e in encoded:
+                    offsets.append(offsets[-1] + len(e))
+                dict_offsets = _little_endian(offsets).tobytes()
+                dict_blob = b''.join(encoded)
+            else:
+                data = array(typecode, (v if v is not None else 0 for v in values))
+            data = _little_endian(data).tobytes()
+
+            chunks.append({
+                'offset': self._file.tell(),
+                'null_count': num_rows - len(present),
+                'min': min(present, key=stat_key) if present else None,
+                'max': max(present, key=stat_key) if present else None,
+                'bitmap_length': len(bitmap),
+                'data_length': len(data),
+                'dict_offsets_length': len(dict_offsets),
+                'dict_blob_length': len(dict_blob),
+            })
+            self._file.write(bitmap)
+            self._file.write(data)
+            self._file.write(dict_offsets)
+            self._file.write(dict_blob)
+
+        self._row_groups.append({'num_rows': num_rows, 'columns': chunks})
+        self._rows = []
+
+    def close(self):
+        if self._file.closed:
+            return
+
+        self._flush()
+        footer = json.dumps({
+            'columns': [ {'name': name, 'kind': kind, 'typecode': typecode, 'scale': scale,
+                          'itemsize': array(typecode).itemsize}
+                         for name, kind, typecode, scale in self.columns ],
+            'row_groups': self._row_groups,
+        }).encode('utf-8')
+
+        self._file.write(footer)
+        self._file.write(FOOTER_LENGTH.pack(len(footer)))
+        self._file.write(MAGIC)
+        self._file.close()
+
+
+class ColumnarReader(object):
+    '''Memory-mapped reader of the columnar output file.
+       Only the chunks of requested columns are touched.
+    '''
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        if os.fstat(self._file.fileno()).st_size < 2 * len(MAGIC) + FOOTER_LENGTH.size:
+            self._file.close()
+            raise ValueError('%s is not a columnar file' % path)
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        tail = len(self._mm) - len(MAGIC)
+        if self._mm[:len(MAGIC)] != MAGIC or self._mm[tail:] != MAGIC:
+            self.close()
+            raise ValueError('%s is not a columnar file' % path)
+
+        footer_end = tail - FOOTER_LENGTH.size
+        footer_length, = FOOTER_LENGTH.unpack(self._mm[footer_end:tail])
+        if footer_length > footer_end - len(MAGIC):
+            self.close()
+            raise ValueError('%s is not a columnar file' % path)
+        footer = json.loads(self._mm[footer_end - footer_length:footer_end].decode('utf-8'))
+
+        self.columns = footer['columns']
+        self.row_groups = footer['row_groups']
+        self._column_index = { c['name']: i for i, c in enumerate(self.columns) }
+
+        for c in self.columns:
+            if array(c['typecode']).itemsize != c['itemsize']:
+                self.close()
+                raise ValueError('column %s itemsize %d not supported on this platform'
+                                 % (c['name'], c['itemsize']))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    @property
+    def names(self):
+        return [ c['name'] for c in self.columns ]
+
+    @property
+    def num_rows(self):
+        return sum(rg['num_rows'] for rg in self.row_groups)
+
+    def _array(self, typecode, start, length):
+        arr = array(typecode)
+        arr.frombytes(self._mm[start:start + length])
+        return _little_endian(arr)
+
+    def read_chunk(self, name, group):
+        '''return: values of column `name` in row group `group`, None for null'''
+        column = self.columns[self._column_index[name]]
+        kind, typecode, scale = column['kind'], column['typecode'], column['scale']
+        num_rows = self.row_groups[group]['num_rows']
+        chunk = self.row_groups[group]['columns'][self._column_index[name]]
+
+        pos = chunk['offset']
+        bitmap = self._mm[pos:pos + chunk['bitmap_length']]
+        pos += chunk['bitmap_length']
+        data = self._array(typecode, pos, chunk['data_length'])
+        pos += chunk['data_length']
+
+        if kind in DICTIONARY_KINDS:
+            offsets = self._array(INDEX_TYPECODE, pos, chunk['dict_offsets_length'])
+            pos += chunk['dict_offsets_length']
+            blob = self._mm[pos:pos + chunk['dict_blob_length']]
+            dictionary = [ _decode(kind, scale, blob[offsets[k]:offsets[k+1]].decode('utf-8'))
+                           for k in range(len(offsets) - 1) ]
+            values = [ dictionary[v] for v in data ]
+        else:
+            values = [ _decode(kind, scale, v) for v in data ]
+
+        return [ v if bitmap[j >> 3] & (1 << (j & 7)) else None for j, v in enumerate(values[:num_rows]) ]
+
+    def read_column(self, name):
+        '''return: all values of column `name`, None for null'''
+        values = []
+        for group in range(len(self.row_groups)):
+            values.extend(self.read_chunk(name, group))
+        return values
+
+    def stats(self, name):
+        '''return: list of (num_rows, null_count, min, max) for each row group'''
+        column = self.columns[self._column_index[name]]
+        kind, scale = column['kind'], column['scale']
+        return [ (rg['num_rows'], chunk['null_count'], _decode(kind, scale, chunk['min']),
+                  _decode(kind, scale, chunk['max']))
+                 for rg in self.row_groups
+                 for chunk in (rg['columns'][self._column_index[name]], ) ]
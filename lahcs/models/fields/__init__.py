@@ -1,8 +1,11 @@
 import re
 import decimal
 import datetime
+from collections import OrderedDict
 from functools import total_ordering
 
+from lahcs.core.exceptions import JobConfigError
+
 
 class FieldParseError(Exception):
     '''Exception type for Field Inner'''
@@ -112,9 +115,112 @@ class StringField(RegexField):
 
 
 
+class _PureCheck(object):
+    '''wrapper to declare callables without writable attributes as pure'''
+    pure = True
+
+    def __init__(self, func):
+        self.func = func
+
+    def __call__(self, content):
+        return self.func(content)
+
+
+def pure(func):
+    '''declare a user defined check function as pure, so it can be memoized'''
+    try:
+        func.pure = True
+    except AttributeError:
+        # builtins, bound methods ...
+        return _PureCheck(func)
+    return func
+
+
+class DumpMemo(object):
+    '''Bounded LRU cache of WriteField.dump, for both outputs and failures.
+
+       After SAMPLE_SIZE lookups, the cache is disabled if the hit rate is
+       lower than MIN_HIT_RATE, the column is not low-cardinality.
+    '''
+    SAMPLE_SIZE = 1024
+    MIN_HIT_RATE = 0.5
+
+    # content types whose equal values always dump to the same output,
+    # others (float -0.0 / 0.0, tz-aware datetimes ...) bypass the cache
+    CACHED_TYPES = (str, int, bool, type(None))
+
+    def __init__(self, dump, size):
+        self._dump = dump
+        self.size = size
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.disabled = False
+
+    def __call__(self, content):
+        if self.disabled or content.__class__ not in self.CACHED_TYPES:
+            return self._dump(content)
+
+        key = (content.__class__, content)
+        try:
+            result = self.cache[key]
+        except KeyError:
+            self.misses += 1
+            try:
+                result = (True, self._dump(content))
+            except FieldParseError as e:
+                result = (False, e.args[0])
+
+            self.cache[key] = result
+            if len(self.cache) > self.size:
+                self.cache.popitem(last=False)
+
+            lookups = self.hits + self.misses
+            if lookups >= self.SAMPLE_SIZE and self.hits < lookups * self.MIN_HIT_RATE:
+                self.disabled = True
+                self.cache.clear()
+        else:
+            self.hits += 1
+            self.cache.move_to_end(key)
+
+        ok, value = result
+        if not ok:
+            raise FieldParseError(value)
+        return value
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self.cache),
+            'disabled': self.disabled,
+        }
+
+
 class WriteField(BaseField):
     '''Base class for all write field types'''
-    
+
+    def __init__(self, check=None, memo=0):
+        '''
+            check: user defined function to accept the content
+            memo: max size of the dump cache, 0 for no cache.
+                  check must be declared by `pure` while memo is used
+        '''
+        super().__init__()
+
+        self.check = check
+        self.memo = None
+        if memo:
+            if check is not None and not getattr(check, 'pure', False):
+                raise JobConfigError('check function of memoized %s must be declared pure' % self.__class__.__name__)
+            self.memo = DumpMemo(self.dump, memo)
+            self.dump = self.memo
+
+    def memo_stats(self):
+        return self.memo.stats() if self.memo else None
+
     def dump(self, content):
         raise NotImplementedError()
 
@@ -122,14 +228,13 @@ class WriteField(BaseField):
 class String(WriteField):
     '''String Write Field. '''
 
-    def __init__(self, max_length=-1, null=True, regex=None, check=None):
-        super().__init__()
+    def __init__(self, max_length=-1, null=True, regex=None, check=None, memo=0):
+        super().__init__(check=check, memo=memo)
 
         self.max_length = max_length
         self.null = null
         self.regex_str = regex
         self.regex_compiled = re.compile(regex) if regex else None
-        self.check = check
 
     def dump(self, content):
         if isinstance(content, str):
@@ -156,12 +261,11 @@ class BaseIntegerWriteField(WriteField):
     SIGNED_INTEGER_RANGE = (0, 0)
     UNSIGNED_INTEGER_RANGE = (0, 0)
 
-    def __init__(self, null=True, unsigned=False, check=None):
-        super().__init__()
+    def __init__(self, null=True, unsigned=False, check=None, memo=0):
+        super().__init__(check=check, memo=memo)
 
         self.null = null
         self.unsigned = unsigned
-        self.check = check
 
     def dump(self, content):
         if isinstance(content, str):
@@ -225,12 +329,11 @@ class BaseFloatWriteField(WriteField):
     SIGNED_Float_RANGE = (0.0, 0.0)
     UNSIGNED_Float_RANGE = (0.0, 0.0)
 
-    def __init__(self, null=True, unsigned=False, check=None):
-        super().__init__()
+    def __init__(self, null=True, unsigned=False, check=None, memo=0):
+        super().__init__(check=check, memo=memo)
 
         self.null = null
         self.unsigned = unsigned
-        self.check = check
 
     def dump(self, content):
         if isinstance(content, str):
@@ -281,15 +384,14 @@ class Double(BaseFloatWriteField):
 
 class Decimal(WriteField):
     '''Decimal'''
-    def __init__(self, m, d, null=True, unsigned=False, check=None):
-        super().__init__()
+    def __init__(self, m, d, null=True, unsigned=False, check=None, memo=0):
+        super().__init__(check=check, memo=memo)
 
         assert m >= d
         self.m = m
         self.d = d
         self.null = null
         self.unsigned = unsigned
-        self.check = check
 
     def dump(self, content):
         if isinstance(content, str):
@@ -316,7 +418,7 @@ class Decimal(WriteField):
         else:
             if self.unsigned and number < 0:
                 raise FieldParseError('number exceed range of unsigned %s' % self.__class__.__name__ )
-            if abs(int(number)) >= 10**(m-d):
+            if abs(int(number)) >= 10**(self.m-self.d):
                 raise FieldParseError('number exceed range of %s' % self.__class__.__name__ )
 
         if self.check and not self.check(number):
@@ -327,12 +429,11 @@ class Decimal(WriteField):
 
 class Date(WriteField):
     '''Date'''
-    def __init__(self, null=True, format='%Y-%m-%d', check=None):
-        super().__init__()
+    def __init__(self, null=True, format='%Y-%m-%d', check=None, memo=0):
+        super().__init__(check=check, memo=memo)
 
         self.null = null
         self.format = format
-        self.check = check
 
     def dump(self, content):
         if isinstance(content, str):
@@ -363,12 +464,11 @@ class Date(WriteField):
 
 class Timestamp(WriteField):
     '''Timestamp'''
-    def __init__(self, null=True, format='%Y-%m-%d %H:%M:%S', check=None):
-        super().__init__()
+    def __init__(self, null=True, format='%Y-%m-%d %H:%M:%S', check=None, memo=0):
+        super().__init__(check=check, memo=memo)
 
         self.null = null
         self.format = format
-        self.check = check
 
     def dump(self, content):
         if isinstance(content, str):
@@ -19,3 +19,7 @@ DW_ENV = {
     'DW_TMP': DW_TMP,
     'DW_HD1': DW_HD1,
 }
+
+
+# 守护进程
+DAEMON_SOCKET = os.path.join(DW_TMP, 'lahcs.sock')
@@ -1,5 +1,10 @@
-import logging
+import os
 import re
+import glob
+import fnmatch
+import logging
+import functools
+import importlib
 
 from lahcs import settings
 from lahcs.core.exceptions import SHEvaluationError
@@ -27,6 +32,54 @@ def set_logger(logname, screen=True, logpath=None):
         logger.addHandler(fh)
 
 
+class ShTemplate(object):
+    '''
+    string with parameter ${XX}, parsed once into literal and parameter segments
+    '''
+    REG = re.compile(r'\$\{([a-zA-Z_]\w*)\}')
+
+    def __init__(self, s):
+        self.s = s
+        self.segments = []      # list of (is_param, text)
+
+        pos = 0
+        for m in self.REG.finditer(s):
+            if m.start() > pos:
+                self.segments.append((False, s[pos:m.start()]))
+            self.segments.append((True, m.group(1)))
+            pos = m.end()
+        if pos < len(s):
+            self.segments.append((False, s[pos:]))
+
+    def render(self, *envs, strict=True):
+        '''
+        envs: list of dicts, the later one overrides the former
+        strict: if True, each parameter will be set, or evaluation will fail
+                else, if parameter not set, default will be ''
+        '''
+        parts = []
+        for is_param, text in self.segments:
+            if not is_param:
+                parts.append(text)
+                continue
+
+            for env in reversed(envs):
+                if text in env:
+                    parts.append(str(env[text]))
+                    break
+            else:
+                if strict:
+                    raise SHEvaluationError('parameter ${%s} is invalid' % text)
+
+        return ''.join(parts)
+
+
+@functools.lru_cache(maxsize=1024)
+def sh_template(s):
+    '''return: the cached ShTemplate of string s'''
+    return ShTemplate(s)
+
+
 def sh_envaluate(s, *envs, strict=True):
     '''
     replace parameter ${XX} in the string s
@@ -34,37 +87,75 @@ def sh_envaluate(s, *envs, strict=True):
     strict: if True, each parameter will be set, or evaluation will fail
             else, if parameter not set, default will be ''
     '''
-    if len(envs) == 1:
-        env = envs[0]
-    else:
-        env = {}
-        for e in envs:
-            env.update(e)
-
-    reg = re.compile(r'\$\{([a-zA-Z_]\w*)\}')
-    v = ''
-
-    while True:
-        search = reg.search(s)
-        if not search:
-            v += s
-            break
-
-        start, end = search.span()
-        name = search.group(1)
-
-        if name not in env:
-            if strict:
-                raise SHEvaluationError('parameter ${%s} is invalid' % name)
-            else:
-                value = ''
-        else:
-            value = str(env[name])
+    return sh_template(s).render(*envs, strict=strict)
+
 
-        v += s[:start] + value
-        s = s[end:]
+############################################
+######   import
+############################################
+
+def import_object(path):
+    '''
+    return: the object of dotted path like `lahcs.xfr.DefaultXfr`
+            if path is not a string, it is returned as is
+    '''
+    if not isinstance(path, str):
+        return path
+
+    module_name, _, name = path.rpartition('.')
+    return getattr(importlib.import_module(module_name), name)
 
-    return v
+
+############################################
+######   file glob
+############################################
+
+class GlobCache(object):
+    '''
+    glob with results cached per (dirname, basename), invalidated by directory mtime.
+    patterns with magic only in the basename share the listing of their directory,
+    others fall back to glob.
+    '''
+    def __init__(self):
+        self.listings = {}      # dirname: (mtime, names)
+        self.results = {}       # (dirname, basename): (mtime, paths)
+
+    def _listdir(self, dirname, mtime):
+        cached = self.listings.get(dirname)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        try:
+            names = os.listdir(dirname or os.curdir)
+        except OSError:
+            names = []
+        self.listings[dirname] = (mtime, names)
+        return names
+
+    def glob(self, pattern):
+        dirname, basename = os.path.split(pattern)
+        if glob.has_magic(dirname):
+            return glob.glob(pattern)
+
+        if not glob.has_magic(basename):
+            return [pattern] if os.path.lexists(pattern) else []
+
+        try:
+            mtime = os.stat(dirname or os.curdir).st_mtime_ns
+        except OSError:
+            return []
+
+        key = (dirname, basename)
+        cached = self.results.get(key)
+        if cached and cached[0] == mtime:
+            return list(cached[1])
+
+        names = self._listdir(dirname, mtime)
+        if not basename.startswith('.'):
+            names = [ n for n in names if not n.startswith('.') ]
+        paths = [ os.path.join(dirname, n) for n in fnmatch.filter(names, basename) ]
+        self.results[key] = (mtime, paths)
+        return list(paths)
 
 
 
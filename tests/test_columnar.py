@@ -0,0 +1,121 @@
+import os
+import decimal
+import datetime
+import tempfile
+import unittest
+
+from lahcs.core.op import transform
+from lahcs.models import TextReadModel, FieldError
+from lahcs.models.fields import StringField, String, Int, BigInt, Double, Decimal, Date, Timestamp
+from lahcs.models.columnar import ColumnarWriteModel, ColumnarReader
+from lahcs.xfr import DefaultXfr
+
+
+class ReadModel(TextReadModel):
+    s = StringField(',')
+    i = StringField(',')
+    u = StringField(',')
+    f = StringField(',')
+    m = StringField(',')
+    d = StringField(',')
+    t = StringField('')
+
+
+class WriteModel(ColumnarWriteModel):
+    ROW_GROUP_SIZE = 3
+
+    s = String()
+    i = Int()
+    u = BigInt(unsigned=True)
+    f = Double()
+    m = Decimal(10, 2)
+    d = Date()
+    t = Timestamp()
+
+
+ROWS = [
+    ('a', '-5', '18446744073709551615', '1.5', '1.25', '2020-01-01', '2020-01-01 12:30:45'),
+    ('', '', '', '', '', '', ''),
+    ('b', '7', '0', '-2.25', '-3.1', '0001-01-01', '0001-01-01 00:00:00'),
+    ('a', '0', '3', '0.0', '0', '9999-12-31', '1969-12-31 23:59:59'),
+]
+
+EXPECTED = {
+    's': ['a', None, 'b', 'a'],
+    'i': [-5, None, 7, 0],
+    'u': [2**64-1, None, 0, 3],
+    'f': [1.5, None, -2.25, 0.0],
+    'm': [decimal.Decimal('1.25'), None, decimal.Decimal('-3.10'), decimal.Decimal('0')],
+    'd': [datetime.date(2020, 1, 1), None, datetime.date(1, 1, 1), datetime.date(9999, 12, 31)],
+    't': [datetime.datetime(2020, 1, 1, 12, 30, 45), None, datetime.datetime(1, 1, 1),
+          datetime.datetime(1969, 12, 31, 23, 59, 59)],
+}
+
+
+class ColumnarTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.src_path = os.path.join(self.tmpdir.name, 'src.dat')
+        self.tar_path = os.path.join(self.tmpdir.name, 'tar.dat')
+        self.err_path = os.path.join(self.tmpdir.name, 'err.dat')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _transform(self, rows):
+        with open(self.src_path, 'w') as f:
+            f.writelines(','.join(row) + '\n' for row in rows)
+        return transform(ReadModel(), WriteModel(), DefaultXfr(), self.src_path, self.tar_path, self.err_path)
+
+    def test_round_trip(self):
+        self.assertEqual(self._transform(ROWS), 0)
+
+        with ColumnarReader(self.tar_path) as reader:
+            self.assertEqual(reader.names, list(EXPECTED))
+            self.assertEqual(reader.num_rows, len(ROWS))
+            self.assertEqual(len(reader.row_groups), 2)
+            for name, values in EXPECTED.items():
+                self.assertEqual(reader.read_column(name), values, name)
+
+            self.assertEqual(reader.stats('i'), [(3, 1, -5, 7), (1, 0, 0, 0)])
+            self.assertEqual(reader.stats('d')[0][2:], (datetime.date(1, 1, 1), datetime.date(2020, 1, 1)))
+
+    def test_wide_decimal(self):
+        class WideReadModel(TextReadModel):
+            w = StringField('')
+
+        class WideWriteModel(ColumnarWriteModel):
+            w = Decimal(20, 2)
+
+        with open(self.src_path, 'w') as f:
+            f.write('10.25\n9.5\n\n123456789012345678.99\n')
+        err_cnt = transform(WideReadModel(), WideWriteModel(), DefaultXfr(), self.src_path, self.tar_path, self.err_path)
+        self.assertEqual(err_cnt, 0)
+
+        with ColumnarReader(self.tar_path) as reader:
+            self.assertEqual(reader.columns[0]['kind'], 'wide_decimal')
+            self.assertEqual(reader.read_column('w'), [decimal.Decimal('10.25'), decimal.Decimal('9.5'), None,
+                                                       decimal.Decimal('123456789012345678.99')])
+            self.assertEqual(reader.stats('w'), [(4, 1, decimal.Decimal('9.5'), decimal.Decimal('123456789012345678.99'))])
+
+    def test_inexact_decimal_is_error(self):
+        rows = [ROWS[0][:4] + ('1.239', ) + ROWS[0][5:], ROWS[2]]
+        self.assertEqual(self._transform(rows), 1)
+
+        with ColumnarReader(self.tar_path) as reader:
+            self.assertEqual(reader.read_column('m'), [decimal.Decimal('-3.10')])
+
+    def test_inexact_decimal_parse(self):
+        with self.assertRaises(FieldError):
+            WriteModel()._parse(dict(zip(EXPECTED, ROWS[0][:4] + ('1.239', ) + ROWS[0][5:])))
+
+    def test_not_columnar_file(self):
+        for content in (b'', b'LAHCS', b'x' * 100):
+            with open(self.tar_path, 'wb') as f:
+                f.write(content)
+            with self.assertRaisesRegex(ValueError, 'not a columnar file'):
+                ColumnarReader(self.tar_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
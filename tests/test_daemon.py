@@ -0,0 +1,84 @@
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+from lahcs.core import daemon
+from lahcs.core.exceptions import ExcutingError
+from lahcs.models import TextReadModel, TextWriteModel
+from lahcs.models.fields import StringField, String
+from lahcs.xfr import BaseXfr
+
+
+class ReadModel(TextReadModel):
+    a = StringField('')
+
+
+class WriteModel(TextWriteModel):
+    a = String(memo=4)
+
+
+class KillXfr(BaseXfr):
+    def transform(self, d, out):
+        os._exit(9)
+
+
+class DaemonTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.tmpdir.name, 'lahcs.sock')
+        self.paths = [ os.path.join(self.tmpdir.name, n) for n in ('src', 'tar', 'err') ]
+        with open(self.paths[0], 'w') as f:
+            f.write('x\nx\ny\n')
+
+        self.server = daemon.TransformDaemon(self.socket_path, processes=1)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        self.tmpdir.cleanup()
+
+    def _request(self, xfr='lahcs.xfr.DefaultXfr'):
+        return daemon.request(*self.paths, __name__ + '.ReadModel', __name__ + '.WriteModel', xfr,
+                              socket_path=self.socket_path)
+
+    def test_memo_stats_per_request(self):
+        for _ in range(2):
+            resp = self._request()
+            self.assertEqual(resp['err_cnt'], 0)
+            memo = resp['stats']['memo']['a']
+            self.assertEqual(memo['hits'] + memo['misses'], 3)
+
+    def test_refuse_live_socket(self):
+        with self.assertRaisesRegex(ExcutingError, 'another daemon'):
+            daemon.TransformDaemon(self.socket_path, processes=1)
+        self.assertEqual(self._request()['err_cnt'], 0)
+
+    def test_not_a_socket(self):
+        with self.assertRaisesRegex(ExcutingError, 'not a socket'):
+            daemon.TransformDaemon(self.paths[0], processes=1)
+        self.assertTrue(os.path.exists(self.paths[0]))
+
+    def test_stale_socket(self):
+        stale_path = os.path.join(self.tmpdir.name, 'stale.sock')
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(stale_path)
+        sock.close()
+
+        server = daemon.TransformDaemon(stale_path, processes=1)
+        server.server_close()
+
+    def test_dead_worker(self):
+        resp = self._request(__name__ + '.KillXfr')
+        self.assertIn('BrokenProcessPool', resp['error'])
+
+        resp = self._request()
+        self.assertEqual(resp['err_cnt'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
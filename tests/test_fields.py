@@ -0,0 +1,59 @@
+import datetime
+import unittest
+
+from lahcs.core.exceptions import JobConfigError
+from lahcs.models.fields import String, Int, Double, Timestamp, FieldParseError, pure
+
+
+class Validator(object):
+    def is_ok(self, s):
+        return s != 'bad'
+
+
+class MemoTest(unittest.TestCase):
+    def test_outputs_and_failures_are_cached(self):
+        field = String(regex='x', memo=4)
+        for _ in range(3):
+            self.assertEqual(field.dump('x1'), 'x1')
+            with self.assertRaises(FieldParseError):
+                field.dump('y1')
+
+        stats = field.memo_stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['size']), (4, 2, 2))
+
+    def test_key_by_type(self):
+        field = Int(memo=4)
+        self.assertEqual(field.dump(1), '1')
+        self.assertEqual(field.dump(True), 'True')
+
+    def test_negative_zero_is_not_cached(self):
+        field = Double(memo=8)
+        self.assertEqual(field.dump(0.0), '0.0')
+        self.assertEqual(field.dump(-0.0), '-0.0')
+
+    def test_equal_tz_aware_timestamps_are_not_cached(self):
+        field = Timestamp(memo=8)
+        utc = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+        local = datetime.datetime(2020, 1, 1, 8, tzinfo=datetime.timezone(datetime.timedelta(hours=8)))
+        self.assertEqual(field.dump(utc), '2020-01-01 00:00:00')
+        self.assertEqual(field.dump(local), '2020-01-01 08:00:00')
+        self.assertEqual(field.memo_stats()['misses'], 0)
+
+    def test_impure_check_is_rejected(self):
+        with self.assertRaises(JobConfigError):
+            String(check=lambda s: True, memo=4)
+
+    def test_pure_builtin_and_bound_method(self):
+        field = String(check=pure(str.isdigit), memo=4)
+        self.assertEqual(field.dump('12'), '12')
+        with self.assertRaises(FieldParseError):
+            field.dump('a')
+
+        field = String(check=pure(Validator().is_ok), memo=4)
+        self.assertEqual(field.dump('good'), 'good')
+        with self.assertRaises(FieldParseError):
+            field.dump('bad')
+
+
+if __name__ == '__main__':
+    unittest.main()
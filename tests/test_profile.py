@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+
+from lahcs.core.op import transform
+from lahcs.core.profile import _Timer
+from lahcs.models import TextReadModel, TextWriteModel
+from lahcs.models.fields import StringField, String
+from lahcs.xfr import BaseXfr
+
+
+class ReadModel(TextReadModel):
+    a = StringField('')
+
+
+class WriteModel(TextWriteModel):
+    a = String(memo=4)
+
+
+class FailingXfr(BaseXfr):
+    def transform(self, d, out):
+        if d['a'] == 'boom':
+            raise KeyError(d['a'])
+        out.put(d)
+
+
+class ProfileTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.paths = [ os.path.join(self.tmpdir.name, n) for n in ('src', 'tar', 'err') ]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _transform(self, lines, xfr):
+        with open(self.paths[0], 'w') as f:
+            f.writelines(line + '\n' for line in lines)
+        return transform(ReadModel(), WriteModel(), xfr, *self.paths, profile='cprofile')
+
+    def assertNotInstrumented(self, xfr):
+        self.assertNotIsInstance(ReadModel.a.extract, _Timer)
+        self.assertNotIsInstance(WriteModel.a.dump, _Timer)
+        self.assertNotIn('extract', vars(ReadModel.a))
+        self.assertNotIn('transform', vars(xfr))
+
+    def test_report(self):
+        xfr = FailingXfr()
+        self.assertEqual(self._transform(['x', 'y'], xfr), 0)
+        self.assertNotInstrumented(xfr)
+
+        with open(self.paths[2] + '.prof') as f:
+            report = f.read()
+        self.assertIn('write a String', report)
+        self.assertIn('xfr   FailingXfr.transform', report)
+
+    def test_uninstalled_after_exception(self):
+        xfr = FailingXfr()
+        with self.assertRaises(KeyError):
+            self._transform(['x', 'boom'], xfr)
+        self.assertNotInstrumented(xfr)
+
+
+if __name__ == '__main__':
+    unittest.main()
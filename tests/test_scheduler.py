@@ -0,0 +1,110 @@
+import os
+import time
+import tempfile
+import unittest
+
+from lahcs.core.scheduler import Job, Scheduler
+
+
+class FakeJob(Job):
+    '''job with a given source size, which may kill its worker'''
+
+    def __init__(self, tbl_id, size, exit_code=None):
+        super().__init__('sa', tbl_id, [], 1, None, None)
+        self.size = size
+        self.exit_code = exit_code
+
+    def source_size(self):
+        return self.size
+
+    def run(self):
+        if self.exit_code is not None:
+            os._exit(self.exit_code)
+        return self.size
+
+
+class RecordJob(FakeJob):
+    '''job appending its start and end time to a log file'''
+
+    def __init__(self, tbl_id, size, weight, log_path, seconds=0.1):
+        super().__init__(tbl_id, size)
+        self.weight = weight
+        self.log_path = log_path
+        self.seconds = seconds
+
+    def run(self):
+        start = time.time()
+        time.sleep(self.seconds)
+        with open(self.log_path, 'a') as f:
+            f.write('%s %r %r\n' % (self.tbl_id, start, time.time()))
+        return 0
+
+
+class SchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.log_path = os.path.join(self.tmpdir.name, 'log')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _run(self, specs, processes, capacity):
+        '''specs: list of (tbl_id, size, weight). return: {tbl_id: (start, end)}, tbl_ids in start order'''
+        jobs = [RecordJob(tbl_id, size, weight, self.log_path) for tbl_id, size, weight in specs]
+        summaries = Scheduler(processes=processes, capacity=capacity).run(jobs)
+        self.assertTrue(all(s['error'] is None for s in summaries))
+
+        with open(self.log_path) as f:
+            intervals = { tbl_id: (float(start), float(end)) for tbl_id, start, end in map(str.split, f) }
+        return intervals, sorted(intervals, key=lambda t: intervals[t][0])
+
+    def assertWithinCapacity(self, specs, intervals, capacity):
+        weights = { tbl_id: weight for tbl_id, size, weight in specs }
+        for tbl_id, (start, end) in intervals.items():
+            running = [ t for t, (s, e) in intervals.items() if s <= start < e ]
+            if weights[tbl_id] > capacity:
+                self.assertEqual(running, [tbl_id], '%s should run alone' % tbl_id)
+            else:
+                self.assertLessEqual(sum(weights[t] for t in running), capacity, running)
+
+    def test_largest_first(self):
+        specs = [('t%d' % size, size, 1) for size in (3, 10, 1, 7, 5)]
+        intervals, order = self._run(specs, processes=1, capacity=1)
+        self.assertEqual(order, ['t10', 't7', 't5', 't3', 't1'])
+
+    def test_weight_within_capacity(self):
+        for capacity, weights in ((2, (1, 1, 1, 1, 2, 2)), (3, (2, 1, 2, 1, 3, 1)), (4, (3, 2, 2, 1, 1, 1))):
+            specs = [('t%d' % i, 10 - i, w) for i, w in enumerate(weights)]
+            if os.path.exists(self.log_path):
+                os.remove(self.log_path)
+            intervals, order = self._run(specs, processes=4, capacity=capacity)
+            self.assertEqual(len(intervals), len(specs))
+            self.assertWithinCapacity(specs, intervals, capacity)
+
+    def test_heavier_than_capacity_runs_alone(self):
+        specs = [('heavy', 5, 5), ('a', 10, 1), ('b', 1, 1), ('c', 2, 1)]
+        intervals, order = self._run(specs, processes=4, capacity=2)
+        # a is larger, heavy waits for it and then runs before the smaller ones
+        self.assertEqual(order[:2], ['a', 'heavy'])
+        self.assertEqual(sorted(order[2:]), ['b', 'c'])
+        self.assertWithinCapacity(specs, intervals, 2)
+
+    def test_summaries(self):
+        jobs = [FakeJob('t%d' % i, i) for i in range(4)]
+        summaries = Scheduler(processes=2).run(jobs)
+
+        self.assertEqual([s['job'] for s in summaries], ['sa.t0', 'sa.t1', 'sa.t2', 'sa.t3'])
+        self.assertEqual([s['err_cnt'] for s in summaries], [0, 1, 2, 3])
+        self.assertTrue(all(s['error'] is None for s in summaries))
+
+    def test_dead_worker(self):
+        jobs = [FakeJob('big', 10, exit_code=9), FakeJob('small', 1), FakeJob('tiny', 0)]
+        summaries = Scheduler(processes=1).run(jobs)
+
+        self.assertIn('BrokenProcessPool', summaries[0]['error'])
+        self.assertEqual([s['err_cnt'] for s in summaries[1:]], [1, 0])
+        self.assertTrue(all(s['error'] is None for s in summaries[1:]))
+
+
+if __name__ == '__main__':
+    unittest.main()
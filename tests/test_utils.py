@@ -0,0 +1,106 @@
+import os
+import glob
+import tempfile
+import unittest
+from unittest import mock
+
+from lahcs import utils
+from lahcs.core import terminals
+from lahcs.core.exceptions import SHEvaluationError
+
+
+class ShTemplateTest(unittest.TestCase):
+    def test_segments(self):
+        template = utils.ShTemplate('a${X}b${Y_1}${X}')
+        self.assertEqual(template.segments, [(False, 'a'), (True, 'X'), (False, 'b'), (True, 'Y_1'), (True, 'X')])
+
+    def test_cached(self):
+        self.assertIs(utils.sh_template('${DW_DIR}/x'), utils.sh_template('${DW_DIR}/x'))
+
+    def test_env_override_order(self):
+        envs = ({'A': 1, 'B': 1, 'C': 1}, {'B': 2, 'C': 2}, {'C': 3})
+        self.assertEqual(utils.sh_envaluate('${A}-${B}-${C}', *envs), '1-2-3')
+        self.assertEqual(utils.sh_envaluate('${A}-${B}-${C}', *reversed(envs)), '1-1-1')
+
+    def test_no_parameter(self):
+        self.assertEqual(utils.sh_envaluate('/a/$b/{c}', {}), '/a/$b/{c}')
+        self.assertEqual(utils.sh_envaluate('', {}), '')
+
+    def test_strict(self):
+        with self.assertRaisesRegex(SHEvaluationError, r'\$\{MISSING\}'):
+            utils.sh_envaluate('/a/${MISSING}/b', {'A': 1})
+        with self.assertRaises(SHEvaluationError):
+            utils.sh_envaluate('${A}', )
+
+    def test_not_strict(self):
+        self.assertEqual(utils.sh_envaluate('/a/${MISSING}/${A}', {'A': 1}, strict=False), '/a//1')
+
+
+class FilesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = self.tmpdir.name
+        for name in ('a.dat', 'b.dat', 'c1.dat', '.hidden.dat', 'x.txt', 'sub1/a.dat', 'sub2/b.dat'):
+            path = os.path.join(self.root, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, 'w').close()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+
+class GlobCacheTest(FilesTestCase):
+    def assertSameAsGlob(self, cache, pattern):
+        pattern = os.path.join(self.root, pattern)
+        self.assertEqual(sorted(cache.glob(pattern)), sorted(glob.glob(pattern)), pattern)
+
+    def test_match_glob(self):
+        cache = utils.GlobCache()
+        for pattern in ('*.dat', '.*.dat', '[ab].dat', '[!a]*.dat', 'c?.dat', 'sub*/*.dat', '*/a.dat',
+                        'x.txt', 'none.txt', 'none/*.dat', 'sub1', '*'):
+            # twice, the second one is served by the cache
+            self.assertSameAsGlob(cache, pattern)
+            self.assertSameAsGlob(cache, pattern)
+
+    def test_cached_result(self):
+        cache = utils.GlobCache()
+        pattern = os.path.join(self.root, '*.dat')
+        cache.glob(pattern)
+        with mock.patch('os.listdir') as listdir, mock.patch('fnmatch.filter') as fnfilter:
+            cache.glob(pattern)
+            cache.glob(os.path.join(self.root, '[ab].dat'))
+        listdir.assert_not_called()
+        fnfilter.assert_called_once()
+
+    def test_invalidation(self):
+        cache = utils.GlobCache()
+        self.assertSameAsGlob(cache, '*.dat')
+        open(os.path.join(self.root, 'd.dat'), 'w').close()
+        self.assertSameAsGlob(cache, '*.dat')
+        self.assertIn(os.path.join(self.root, 'd.dat'), cache.glob(os.path.join(self.root, '*.dat')))
+
+
+class FileTerminalResolveTest(FilesTestCase):
+    def test_resolve(self):
+        terminal = terminals.FileTerminal('sa', 'tbl')
+        with mock.patch.object(terminals, 'DW_ENV', {'DW_LAND': self.root}):
+            src_files = terminal.resolve(['1 ${DW_LAND}/[ab].dat', '2 ${DW_LAND}/*.dat'])
+
+        self.assertEqual(sorted(src_files[:2]), sorted(os.path.join(self.root, n) for n in ('a.dat', 'b.dat')))
+        self.assertEqual(sorted(src_files), sorted(os.path.join(self.root, n) for n in ('a.dat', 'b.dat', 'c1.dat')))
+
+    def test_resolve_errors(self):
+        terminal = terminals.FileTerminal('sa', 'tbl')
+        with mock.patch.object(terminals, 'DW_ENV', {'DW_LAND': self.root}):
+            with self.assertRaises(terminals.JobConfigError):
+                terminal.resolve(['only_one_param'])
+            with self.assertRaises(terminals.ExcutingError):
+                terminal.resolve(['1 ${MISSING}/*.dat'])
+            with self.assertRaises(terminals.ExcutingError):
+                terminal.resolve(['1 ${DW_LAND}/*.none'])
+            with self.assertRaises(terminals.ExcutingError):
+                terminal.resolve(['1 ${DW_LAND}/sub*'])
+
+
+if __name__ == '__main__':
+    unittest.main()